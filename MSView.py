@@ -4,8 +4,214 @@
 # Date last modified: 13-APRIL-2025
 
 # Import needed libraries
+import os
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels below then run as plain NumPy
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Bytes of CSV parsed per streamed chunk in MSPlot.load_csv (roughly 500,000 catalog rows)
+CHUNK_BYTES = 64 << 20
+
+# Number of full microseismic catalogs kept in memory for reuse across MSPlot.load_csv calls
+MS_MEMO_SIZE = 2
+
+# Full catalogs parsed this session, keyed by absolute path, as (mtime, DataFrame), least recently used first
+_ms_memo = {}
+
+# Types the known microseismic catalog columns are parsed into; any other columns are read with inferred
+# types. Coordinates and magnitudes are single precision, which is ample at plot resolution and halves
+# the plot payload.
+MS_COLUMN_TYPES = {
+    'File Name': pa.string(),
+    'Easting (ft)': pa.float32(),
+    'Northing (ft)': pa.float32(),
+    'Depth TVDSS (ft)': pa.float32(),
+    'Origin DateTime': pa.timestamp('ns'),
+    'Brune Magnitude': pa.float32(),
+    'Stage': pa.int16(),
+}
+
+
+@njit(cache=True)
+def _scale_sizes(values, in_lo, in_hi, out_lo, out_hi):
+    """
+    Linearly map the absolute values of an array from [in_lo, in_hi] into [out_lo, out_hi].
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The raw values used to size the plot points.
+
+    in_lo, in_hi : float
+        The smallest and largest absolute values of the whole column the values are taken from, so
+        a given value always maps to the same size.
+
+    out_lo, out_hi : float
+        The smallest and largest output sizes.
+
+    Returns
+    -------
+    numpy.ndarray
+        The scaled sizes. If `in_lo` equals `in_hi`, every size is `out_lo`. Missing (NaN) values
+        are also sized `out_lo`.
+    """
+    a = np.abs(values).astype(np.float64)
+    sizes = out_lo + (a - in_lo) * (out_hi - out_lo) / (in_hi - in_lo + 1e-12)
+    sizes[np.isnan(sizes)] = out_lo
+    return sizes
+
+
+def _in_window(chunk, start, end):
+    """
+    Keep the events of a parsed catalog chunk that fall inside a time window.
+
+    Parameters
+    ----------
+    chunk : pandas.DataFrame
+        The parsed events.
+
+    start, end : pandas.Timestamp or None
+        The time window of events to keep. None keeps all events on that side.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The events with `Origin DateTime` inside the window.
+    """
+    if start is not None:
+        chunk = chunk[chunk['Origin DateTime'] >= start]
+    if end is not None:
+        chunk = chunk[chunk['Origin DateTime'] <= end]
+    return chunk
+
+
+def _parse_ms(abspath, start, end):
+    """
+    Parse a microseismic catalog CSV file, or its Parquet sidecar when that is up to date.
+
+    Parameters
+    ----------
+    abspath : str
+        The absolute path to the CSV file containing the microseismic data.
+
+    start, end : pandas.Timestamp or None
+        The time window of events to keep. None keeps all events on that side.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The parsed events, sorted by `Origin DateTime`.
+    """
+    cache_path = abspath + '.parquet'
+
+    # Restrict the loaded events to the requested time window, if any
+    filters = []
+    if start is not None:
+        filters.append(('Origin DateTime', '>=', start))
+    if end is not None:
+        filters.append(('Origin DateTime', '<=', end))
+
+    # Reuse the cached Parquet file if it is up to date with the CSV and holds all of its columns
+    if (os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(abspath)
+            and set(pd.read_csv(abspath, nrows=0).columns) <= set(pq.read_schema(cache_path).names)):
+        data = pd.read_parquet(cache_path, engine='pyarrow', filters=filters or None)
+    else:
+        chunks = []
+
+        # Parse the known columns straight into their types so PyArrow skips inference and later casts
+        read_options = pacsv.ReadOptions(block_size=CHUNK_BYTES)
+        convert_options = pacsv.ConvertOptions(column_types=MS_COLUMN_TYPES)
+
+        # Stream the CSV file through the PyArrow parser one block at a time
+        try:
+            with pacsv.open_csv(abspath, read_options=read_options, convert_options=convert_options) as reader:
+                for batch in reader:
+                    # Drop events outside the time window before keeping the chunk
+                    chunks.append(_in_window(batch.to_pandas(self_destruct=True), start, end))
+
+                # A catalog with only a header row yields no batches; keep its typed, empty columns
+                if not chunks:
+                    chunks.append(reader.schema.empty_table().to_pandas())
+        except pa.ArrowInvalid:
+            # The streaming reader infers any other column's type from the first block alone, so a later
+            # block that does not fit it (e.g. a sparse column that is empty at first) fails; parse the
+            # whole file at once instead, which infers those types from every block
+            table = pacsv.read_csv(abspath, convert_options=convert_options)
+            chunks = [_in_window(table.to_pandas(self_destruct=True), start, end)]
+
+        data = pd.concat(chunks, ignore_index=True)
+
+        # Sort once so create_plot can select time windows with a binary search
+        data.sort_values('Origin DateTime', inplace=True, ignore_index=True)
+
+        # Cache the parsed data for the next load, unless only part of it was kept
+        if not filters:
+            try:
+                data.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+            except OSError as e:
+                print(f"Could not write cache {cache_path}: {e}")
+
+    # Store the repeated file names and stage labels as categoricals (Parquet does not keep
+    # integer categoricals, so this is applied after either load path)
+    data['File Name'] = data['File Name'].astype('category')
+    data['Stage'] = data['Stage'].astype('category')
+
+    return data
+
+
+def _load_ms(abspath, start, end):
+    """
+    Load a microseismic catalog, reusing the full catalog parsed earlier in this session if unchanged.
+
+    Only full catalogs are kept in memory, one per file and at most MS_MEMO_SIZE files; a load with a
+    time window is served from a kept catalog when there is one, and otherwise streamed with the window
+    applied and not kept.
+
+    Parameters
+    ----------
+    abspath : str
+        The absolute path to the CSV file containing the microseismic data.
+
+    start, end : pandas.Timestamp or None
+        The time window of events to keep. None keeps all events on that side.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The events, sorted by `Origin DateTime`. Callers must not modify it in place.
+    """
+    mtime = os.path.getmtime(abspath)
+
+    # Serve the window from the kept full catalog if the file has not changed since it was parsed
+    kept = _ms_memo.pop(abspath, None)
+    if kept is not None and kept[0] == mtime:
+        _ms_memo[abspath] = kept  # Mark as most recently used
+        data = kept[1]
+        times = data['Origin DateTime']
+        lo = times.searchsorted(start, side='left') if start is not None else 0
+        hi = times.searchsorted(end, side='right') if end is not None else len(times)
+        return data.iloc[lo:hi].reset_index(drop=True)
+
+    data = _parse_ms(abspath, start, end)
+
+    # Keep full catalogs only, evicting the least recently used file beyond MS_MEMO_SIZE
+    if start is None and end is None:
+        _ms_memo[abspath] = (mtime, data)
+        while len(_ms_memo) > MS_MEMO_SIZE:
+            _ms_memo.pop(next(iter(_ms_memo)))
+
+    return data
+
 
 # UPDATE documentation after slider completetion.
 
@@ -31,7 +237,8 @@ class MSPlot():
         The attribute used to determine the size of each plot point. Default is 'Brune Magnitude'.
 
     size_range : list of int
-        The range for scaling the size of the points in the plot. Default is [10, 100].
+        The range of marker diameters, in pixels, that the absolute `size_by` values are scaled into.
+        Default is [10, 100].
 
     plot_start_time : str or None
         The start time for the plot's time range in 'YYYY-MM-DD HH:MM:SS' format. Default is None.
@@ -42,6 +249,10 @@ class MSPlot():
     title : str
         The title of the plot. Default is '3D Bubble Chart of Cumulative Seismic Entries'.
 
+    max_points : int
+        The maximum number of events drawn in a single plot. Larger selections are randomly subsampled
+        to keep the 3D view responsive. Default is 50000.
+
     Methods
     -------
     create_plot(self):
@@ -71,6 +282,9 @@ class MSPlot():
 
     set_title(title):
         Sets the title for the plot.
+
+    set_maxpoints(max_points):
+        Sets the maximum number of events drawn in a single plot.
     """
 
     def __init__(self):
@@ -111,6 +325,9 @@ class MSPlot():
 
         title : str, optional
             The title for the plot. Default is '3D Bubble Chart of Cumulative Seismic Entries'.
+
+        max_points : int, optional
+            The maximum number of events drawn in a single plot. Default is 50000.
         """
         self.MScatalog = None
         self.color_by = 'Stage'
@@ -120,9 +337,13 @@ class MSPlot():
         self.plot_start_time = None
         self.plot_end_time = None
         self.title = '3D Bubble Chart of Cumulative Seismic Entries'
+        self.max_points = 50_000
+        self._color_stats_cache = {}
+        self._size_bounds = {}
 
     def set_colorby(self, color_by):
         self.color_by = color_by
+        self._color_stats_cache.clear()
 
     def set_colorscale(self, color_scale):
         self.color_scale = color_scale
@@ -135,13 +356,19 @@ class MSPlot():
 
     def set_start_time(self, plot_start_time):
         self.plot_start_time = plot_start_time
+        self._color_stats_cache.clear()
 
     def set_end_time(self, plot_end_time):
         self.plot_end_time = plot_end_time
+        self._color_stats_cache.clear()
 
     def set_title(self, title):
         self.title = title
 
+    def set_maxpoints(self, max_points):
+        self.max_points = max_points
+        self._color_stats_cache.clear()
+
     def load_csv(self, MScatalog):
         """
         Load the dataset.
@@ -169,14 +396,31 @@ class MSPlot():
             - Easting (ft): The Easting coordinate of the event in feet.
             - Northing (ft): The Northing coordinate of the event in feet.
             - Depth TVDSS (ft): The depth of the event in feet.
-            - Origin DateTime: A combined datetime column of the origin time in UTC in YYYY-MM-DD HH:MM:ss.sss
-            format (str).
+            - Origin DateTime: The origin time of the event in UTC (datetime64).
             - Brune Magnitude: The Brune magnitude of the event (float).
             - Stage: The stage identifier (int).
+
+        Notes
+        -----
+        - The events are sorted chronologically by `Origin DateTime`.
+        - The parsed data is cached in a `<MScatalog>.parquet` file next to the CSV. Later loads read
+          the cache instead of re-parsing the CSV, as long as the cache is newer than the CSV.
+        - The CSV is parsed in streamed chunks. If a start or end time is already set, only events inside
+          that window are kept, which lowers peak memory for large catalogs. The cache is only written
+          when the whole catalog is loaded.
+        - Fully loaded catalogs are also kept in memory for the session (up to MS_MEMO_SIZE files). Loading
+          the same unchanged file again, with or without a time window, reuses them instead of reading
+          the file.
         """
+        # Restrict the loaded events to the plot time window, if one is already set
+        start = pd.Timestamp(self.plot_start_time) if self.plot_start_time is not None else None
+        end = pd.Timestamp(self.plot_end_time) if self.plot_end_time is not None else None
 
-        # Load the CSV file
-        self.data = pd.read_csv(MScatalog)
+        # Reuse the full catalog if this file was already loaded unchanged in this session
+        data = _load_ms(os.path.abspath(MScatalog), start, end)
+        self.data = data.copy(deep=False)
+        self._color_stats_cache.clear()
+        self._size_bounds.clear()
 
         print('Success!')
 
@@ -199,53 +443,76 @@ class MSPlot():
         plotly.graph_objects.Figure
             A Plotly figure object that can be displayed in a Jupyter notebook or other compatible environments.
             The figure contains an interactive 3D scatter plot with a time-based animation slider.
-
-        Notes
-        -----
-        - The function currently only processes the first 100 rows of the input data (`data.iloc[:101]`),
-          which is meant for development purposes.
         """
-        data = self.data
-
-        # Take the first 100 entries for DEVELOPMENT PURPOSES
-        df_100 = data.iloc[:101]
-
-        # Ensure DateTime values are in chronological order
-        df_100 = df_100.sort_values(by='Origin DateTime')
-
-        # Filter data based on the start and stop times
-        if self.plot_start_time is None:
-            self.plot_start_time = df_100['Origin DateTime'].min()
-
-        if self.plot_end_time is None:
-            self.plot_end_time = df_100['Origin DateTime'].max()
-
-        # Filter dataframe
-        df_filtered = df_100[(df_100['Origin DateTime'] >= self.plot_start_time) & (df_100['Origin DateTime']
-                                                                                    <= self.plot_end_time)]
+        # Origin times are sorted chronologically by load_csv
+        times = self.data['Origin DateTime']
+
+        # Filter data based on the start and stop times (an empty catalog has no bounds to default to)
+        if self.plot_start_time is None and len(times):
+            self.plot_start_time = times.iloc[0]
+
+        if self.plot_end_time is None and len(times):
+            self.plot_end_time = times.iloc[-1]
+
+        # Locate the time window with a binary search over the sorted times
+        lo = (times.searchsorted(pd.Timestamp(self.plot_start_time), side='left') if self.plot_start_time is not None
+              else 0)
+        hi = (times.searchsorted(pd.Timestamp(self.plot_end_time), side='right') if self.plot_end_time is not None
+              else len(times))
+        df_filtered = self.data.iloc[lo:hi]
+
+        # Subsample very large selections so the browser stays interactive, keeping chronological order
+        if len(df_filtered) > self.max_points:
+            idx = np.random.default_rng(0).choice(len(df_filtered), self.max_points, replace=False)
+            df_filtered = df_filtered.iloc[np.sort(idx)]
+
+        # Send the raw hover values; the browser formats them once through the shared hover template
+        customdata = np.column_stack([
+            df_filtered['File Name'].to_numpy(dtype=object),
+            df_filtered['Stage'].to_numpy(),
+            df_filtered['Brune Magnitude'].to_numpy(np.float64).round(2),  # Keep the JSON numbers short
+        ])
+
+        # Extract the plotted columns as NumPy arrays once
+        x = df_filtered['Easting (ft)'].to_numpy()
+        y = df_filtered['Northing (ft)'].to_numpy()
+        z = df_filtered['Depth TVDSS (ft)'].to_numpy()
+        color_arr = df_filtered[self.color_by].to_numpy()
+
+        # Scale sizes against the whole loaded column, so an event keeps its size as the time window moves
+        if self.size_by not in self._size_bounds:
+            # Missing values are skipped, so one blank row does not void the bounds for every event
+            size_abs = np.abs(self.data[self.size_by].to_numpy(np.float64, na_value=np.nan))
+            self._size_bounds[self.size_by] = ((np.nanmin(size_abs), np.nanmax(size_abs))
+                                               if not np.isnan(size_abs).all() else (0.0, 0.0))
+        size_arr = _scale_sizes(df_filtered[self.size_by].to_numpy(np.float64, na_value=np.nan),
+                                *self._size_bounds[self.size_by], *self.size_range)
+
+        # Color range of the selection, skipping missing values (left to Plotly when no value is
+        # selected), computed once per color attribute and time window
+        key = (self.color_by, self.plot_start_time, self.plot_end_time)
+        if key not in self._color_stats_cache:
+            color_vals = np.asarray(color_arr, dtype=np.float64)
+            self._color_stats_cache[key] = ((float(np.nanmin(color_vals)), float(np.nanmax(color_vals)))
+                                            if not np.isnan(color_vals).all() else (None, None))
+        cmin, cmax = self._color_stats_cache[key]
 
         # Create the 3D scatter plot
         MSplot = go.Scatter3d(
-            x=df_filtered['Easting (ft)'],  # X-axis: Easting
-            y=df_filtered['Northing (ft)'],  # Y-axis: Northing
-            z=df_filtered['Depth TVDSS (ft)'],  # Z-axis: Depth
-            text=df_filtered.apply(
-                lambda row: (
-                    f"File: {row['File Name']}<br>"
-                    f"Stage: {row['Stage']}<br>"
-                    f"Magnitude: {row['Brune Magnitude']:.2f}"
-                ),
-                axis=1
-            ),  # ← the missing comma goes here
+            x=x,  # X-axis: Easting
+            y=y,  # Y-axis: Northing
+            z=z,  # Z-axis: Depth
+            customdata=customdata,  # Hover values
+            hovertemplate='File: %{customdata[0]}<br>Stage: %{customdata[1]}<br>'
+                          'Magnitude: %{customdata[2]:.2f}<extra></extra>',  # Hover text
             mode='markers',
             marker=dict(
                 sizemode='diameter',  # Set the size mode to diameter
-                sizeref=25,  # Adjust the size scaling factor
-                size=abs(df_filtered[self.size_by]) * 100,  # Set size
-                color=df_filtered[self.color_by],  # Set which column to color by
+                size=size_arr,  # Set size
+                color=color_arr,  # Set which column to color by
                 colorscale=self.color_scale,  # Set color scale
-                cmin=df_filtered[self.color_by].min(),  # Set min
-                cmax=df_filtered[self.color_by].max(),  # Set max
+                cmin=cmin,  # Set min
+                cmax=cmax,  # Set max
                 colorbar=dict(title=f'{self.color_by}'),  # Color bar title
             ),
             name='Microseismic Events'
@@ -40,22 +40,38 @@ class DataViewer:
         This method creates a Plotly 3D figure and adds all provided Scatter3d traces.
         It also creates two interactive sliders — one for selecting the start time and
         one for the end time of the seismic data range.
+
+        Returns
+        -------
+        plotly.graph_objects.Figure
+            The assembled figure. It is not displayed here; call `.show()` on it (or leave it as the last
+            expression of a notebook cell) to render it.
+
+        Notes
+        -----
+        - Reuse the returned figure for later changes instead of drawing again. Grouping several
+          updates inside `with fig.batch_update():` sends them to the browser as a single update.
         """
         fig = go.Figure()
 
-        # Add traces to the figure
+        # Flatten nested lists of plot objects
+        flat = []
         for b in self.plot_objects:
             if isinstance(b, list):
-                for c in b:
-                    if isinstance(c, go.Scatter3d):  # If yes, add as trace
-                        fig.add_trace(c)
-                    else:  # Otherwise, print error message
-                        print(f"Invalid object: {c}")
+                flat.extend(b)
             else:
-                if isinstance(b, go.Scatter3d):  # If yes, add as trace
-                    fig.add_trace(b)
-                else:  # Otherwise, print error message
-                    print(f"Invalid object: {b}")
+                flat.append(b)
+
+        # Keep only Scatter3d traces, reporting anything else
+        traces = []
+        for c in flat:
+            if isinstance(c, go.Scatter3d):
+                traces.append(c)
+            else:
+                print(f"Invalid object: {c}")
+
+        # Add all traces to the figure in one call
+        fig.add_traces(traces)
 
         # Create slider steps for start and end times
         start_steps, end_steps = self.create_slider_steps()
@@ -65,7 +81,8 @@ class DataViewer:
             scene=dict(
                 xaxis_title='Easting (ft)',
                 yaxis_title='Northing (ft)',
-                zaxis_title='Depth (ft)'
+                zaxis_title='Depth (ft)',
+                aspectmode='data'
             ),
             sliders=[
                 {
@@ -95,8 +112,7 @@ class DataViewer:
             )
         )
 
-        # Show the figure
-        fig.show()
+        return fig
 
     def create_slider_steps(self):
         # Collect all unique times for the slider
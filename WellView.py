@@ -4,51 +4,168 @@
 # Date last modified: 13-APRIL-2025
 
 # Import needed libraries
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 
+WELL_COLUMNS = ['Referenced Easting (ft)', 'Referenced Northing (ft)', 'True Vertical Depth (ft)']
+
+# Number of well trajectory files kept in memory for reuse across WellPlot.load_csv calls
+WELL_MEMO_SIZE = 32
+
+# Wells parsed this session, keyed by absolute path, as (mtime, DataFrame), least recently used first
+_well_memo = {}
+
+# Guards _well_memo, which WellPlot.load_csv updates from several reader threads
+_well_memo_lock = threading.Lock()
+
+
+def _read_well_csv(path):
+    """
+    Read the coordinate columns of one well trajectory CSV file.
+
+    The parsed columns are cached in a `<path>.parquet` file next to the CSV, which is read
+    instead of the CSV as long as it is newer than the CSV. Files already read in this session
+    are reused from memory while unchanged, one version per file and at most WELL_MEMO_SIZE files.
+
+    Parameters
+    ----------
+    path : str
+        The file path to the well trajectory CSV file.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A Pandas DataFrame holding the columns listed in WELL_COLUMNS.
+    """
+    abspath = os.path.abspath(path)
+    mtime = os.path.getmtime(abspath)
+
+    # Reuse the kept frame if the file has not changed since it was parsed
+    with _well_memo_lock:
+        kept = _well_memo.pop(abspath, None)
+        if kept is not None and kept[0] == mtime:
+            _well_memo[abspath] = kept  # Mark as most recently used
+            return kept[1].copy(deep=False)
+
+    df = _parse_well(abspath)
+
+    # Keep one version per file, evicting the least recently used file beyond WELL_MEMO_SIZE
+    with _well_memo_lock:
+        _well_memo[abspath] = (mtime, df)
+        while len(_well_memo) > WELL_MEMO_SIZE:
+            _well_memo.pop(next(iter(_well_memo)))
+
+    return df.copy(deep=False)
+
+
+def _parse_well(abspath):
+    """
+    Parse one well trajectory CSV file, or its Parquet sidecar when that is up to date.
+
+    Parameters
+    ----------
+    abspath : str
+        The absolute path to the well trajectory CSV file.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A Pandas DataFrame holding the columns listed in WELL_COLUMNS.
+    """
+    cache_path = abspath + '.parquet'
+
+    # Reuse the cached Parquet file if it is up to date with the CSV
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(abspath):
+        return pd.read_parquet(cache_path, engine='pyarrow')
+
+    df = pd.read_csv(abspath, engine='pyarrow', usecols=WELL_COLUMNS)
+
+    # Downcast the coordinates; single precision is ample at plot resolution
+    df = df.astype('float32', copy=False)
+
+    # Cache the parsed data for the next load
+    try:
+        df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    except OSError as e:
+        print(f"Could not write cache {cache_path}: {e}")
+
+    return df
+
 
 class WellPlot():
     """
     A class for loading and visualizing 3D well trajectory data using Plotly.
 
     This class provides functionality to read one or more well trajectory CSV files
-    and generate interactive 3D line plots for each well.
+    and generate an interactive 3D line plot of all wells.
 
     Attributes
     ----------
-    data : dict
-        A dictionary containing pandas DataFrames for each well, keyed by well name.
+    paths : list of str
+        The well trajectory CSV files loaded by default when `load_csv` is called without arguments.
+
+    well_names : list of str
+        The names of the loaded wells, in load order.
+
+    ew : numpy.ndarray
+        The Referenced Easting (ft) of every loaded trajectory point. Wells are stored back to back,
+        each followed by a NaN separator.
+
+    ns : numpy.ndarray
+        The Referenced Northing (ft) of every loaded trajectory point, laid out like `ew`.
+
+    tvd : numpy.ndarray
+        The True Vertical Depth (ft) of every loaded trajectory point, laid out like `ew`.
+
+    well_ids : numpy.ndarray
+        The index into `well_names` of the well each point belongs to.
 
     Methods
     -------
-    load_csv(welltraj_files)
-        Loads multiple well trajectory CSV files into the data attribute. Each CSV file
+    load_csv(welltraj_files=None)
+        Loads multiple well trajectory CSV files into the coordinate arrays. Each CSV file
         should contain columns for Referenced Easting (ft), Referenced Northing (ft),
         and True Vertical Depth (ft).
 
     create_plot()
-        Generates a list of Plotly Scatter3d traces for visualizing the well trajectories
-        in a 3D space. Each well is rendered as a separate colored trace.
+        Generates a Plotly Scatter3d trace for visualizing the well trajectories in a 3D space.
+        All wells share one trace, broken between wells and colored per well.
     """
-    def __init__(self):
+    def __init__(self, paths=None):
         """
         Initialize the WellPlot class.
 
-        Initializes the internal data dictionary, which will hold well trajectory
-        data loaded from CSV files.
+        Initializes the empty well name list and coordinate arrays, which will hold well
+        trajectory data loaded from CSV files.
+
+        Parameters
+        ----------
+        paths : list of str, optional
+            The well trajectory CSV files to load when `load_csv` is called without arguments.
+            Default is None (no files).
         """
-        self.data = {}
+        self.paths = list(paths) if paths is not None else []
+        self.well_names = []
+        self.ew = np.empty(0, dtype=np.float32)
+        self.ns = np.empty(0, dtype=np.float32)
+        self.tvd = np.empty(0, dtype=np.float32)
+        self.well_ids = np.empty(0, dtype=int)
 
-    def load_csv(self, welltraj_files):
+    def load_csv(self, welltraj_files=None):
         """
-        Load multiple well trajectory CSV files into the internal data dictionary.
+        Load multiple well trajectory CSV files into the coordinate arrays.
 
         Parameters
         ----------
-        welltraj_files : list of str
-            A list of file paths to well trajectory CSV files.
+        welltraj_files : list of str, optional
+            A list of file paths to well trajectory CSV files. Default is the `paths` given at
+            initialization.
             Each file must contain at least the following columns to be compatible:
             - 'Referenced Easting (ft)'
             - 'Referenced Northing (ft)'
@@ -58,57 +175,92 @@ class WellPlot():
         -------
         bool
             True if all files are successfully loaded, False otherwise.
+
+        Notes
+        -----
+        - Each file's parsed columns are cached in a `<file>.parquet` file next to the CSV and reused
+          on later loads while the cache is newer than the CSV.
         """
-        # Load each CSV file and store in a dictionary with well name
-        for path in welltraj_files:
+        if welltraj_files is None:
+            welltraj_files = self.paths
+
+        # Split the wells already loaded back into per-well segments keyed by well name, so that
+        # reloading a well replaces it in place
+        bounds = np.flatnonzero(np.diff(self.well_ids)) + 1
+        wells = dict(zip(self.well_names, zip(np.split(self.ew, bounds), np.split(self.ns, bounds),
+                                              np.split(self.tvd, bounds))))
+        separator = np.array([np.nan], dtype=np.float32)
+
+        # Read the well files concurrently; each file is independent of the others
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(_read_well_csv, path) for path in welltraj_files]
+
+        # Collect each well's columns in input order, followed by a NaN row that breaks the line
+        for path, future in zip(welltraj_files, futures):
             well_name = path.split('\\')[-1].replace('.csv', '')
             try:
-                df = pd.read_csv(path)
-                self.data[well_name] = df
+                df = future.result()
             except Exception as e:
                 print(f"Error loading {path}: {e}")
                 return False
+            wells[well_name] = tuple(np.concatenate([df[col].to_numpy(np.float32), separator])
+                                     for col in WELL_COLUMNS)
+
+        # Concatenate once all files have loaded
+        empty = [np.empty(0, dtype=np.float32)]
+        self.well_names = list(wells)
+        self.ew = np.concatenate(empty + [seg[0] for seg in wells.values()])
+        self.ns = np.concatenate(empty + [seg[1] for seg in wells.values()])
+        self.tvd = np.concatenate(empty + [seg[2] for seg in wells.values()])
+        self.well_ids = np.concatenate([np.empty(0, dtype=int)]
+                                       + [np.full(len(seg[0]), i) for i, seg in enumerate(wells.values())])
+
         print('Success!')
         return True
 
     def create_plot(self):
         """
-        Create a 3D line plot for each loaded well using Plotly.
+        Create a 3D line plot of all loaded wells using Plotly.
 
         Returns
         -------
         list of plotly.graph_objects.Scatter3d
-            A list of Plotly 3D scatter traces, each representing a well trajectory line.
-            Each well is color-coded and plotted using its respective coordinates.
+            A list holding a single Plotly 3D scatter trace with every well trajectory line.
+            Each well is color-coded, and hovering a line shows its well name.
         """
-        well_traces = []
-
-        df = self.data
+        n_wells = len(self.well_names)
 
         # Generate a color palette with as many colors as wells
         color_scale = px.colors.qualitative.Plotly  # 10-color palette
-        if len(df) > len(color_scale):
+        if n_wells > len(color_scale):
             # If more wells than colors, extend colors using repeat or other methods
             color_scale = px.colors.qualitative.Alphabet  # more unique colors
-        # Add each trace to the well plot
-        for i, (well, df) in enumerate(self.data.items()):
-            # Generate a color for the current well
-            nxtcolor = color_scale[i % len(color_scale)]
-            # Create a 3D scatter trace for the current well
-            well_trace = go.Scatter3d(
-                x=df['Referenced Easting (ft)'],
-                y=df['Referenced Northing (ft)'],
-                z=df['True Vertical Depth (ft)'],
-                mode='lines',
-                line=dict(
-                    color=nxtcolor,
-                    width=3
-                ),
-                name=f'{well} Well'
-            )
-
-            # Append the trace to the well_traces list
-            well_traces.append(well_trace)
+
+        # Resolve each well's color once by cycling the palette (at least two stops for a colorscale)
+        n_stops = max(n_wells, 2)
+        well_colors = (color_scale * (n_stops // len(color_scale) + 1))[:n_stops]
+
+        # Map each well index to its color, and each point to its well's hover label
+        max_id = n_stops - 1
+        well_colorscale = [[i / max_id, color] for i, color in enumerate(well_colors)]
+        well_labels = np.array([f'{well} Well' for well in self.well_names], dtype=object)
+
+        # Create a single 3D scatter trace for all wells
+        well_trace = go.Scatter3d(
+            x=self.ew,
+            y=self.ns,
+            z=self.tvd,
+            text=well_labels[self.well_ids],
+            mode='lines',
+            line=dict(
+                color=self.well_ids,
+                colorscale=well_colorscale,
+                cmin=0,
+                cmax=max_id,
+                width=3
+            ),
+            name='Wells'
+        )
 
         # Return the well log plot object (list of traces)
-        return well_traces
+        return [well_trace]